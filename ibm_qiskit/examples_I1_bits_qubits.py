@@ -1,21 +1,9 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
-from numpy import array
-from numpy import matmul
-
-from IPython.display import display
-
-from qiskit.quantum_info import Statevector
 from qiskit.quantum_info import Operator
-from qiskit.visualization import plot_histogram
 
 from math import sqrt
-from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
-from qiskit import Aer, execute
-from qiskit.quantum_info.operators.predicates import matrix_equal
-
-simulator = Aer.get_backend('statevector_simulator')
+from qiskit import QuantumCircuit
 
 qc211 = QuantumCircuit(1)
 qc211.h(0)
@@ -23,7 +11,9 @@ qc211.s(0)
 
 assert set(g.__class__.__name__ for g, _, _ in list(qc211)).issubset({'_SingletonHGate', '_SingletonSGate'}), ('You may only use H and S gates for this problem')
 
-simulator = Aer.get_backend('statevector_simulator')
+# the circuit is a single 2x2 unitary, apply it to each test state directly
+U = Operator(qc211).data
+
 test_states = {
     '+': [1/sqrt(2), 1/sqrt(2)], '-': [1/sqrt(2), -1/sqrt(2)],
     'i': [1/sqrt(2), 1j/sqrt(2)], '-i': [1/sqrt(2), -1j/sqrt(2)],
@@ -35,20 +25,20 @@ expected_transform = {
 }
 invalid = False
 
+# stack the reference states once, an output state is identified by the
+# reference state it has maximal overlap with (|<ref|state>| = 1 up to a phase)
+ref_names = list(test_states)
+ref_mat = np.array([test_states[name] for name in ref_names], dtype=complex)
+
 for input_name, output_name in expected_transform.items():
 
     print(f'Testing input |{input_name}> with expected output |{output_name}>...')
 
     # Simulate
-    qc_test = QuantumCircuit(1)
-    qc_test.initialize(test_states[input_name], 0)
-    qc_test &= qc211
-    state = execute(qc_test, simulator).result().get_statevector() # execute circuit
-    state_name = str(state)
-
-    for comp_name, comp_state in test_states.items():
-        if matrix_equal(state, comp_state, ignore_phase=True, atol=1e-8, rtol=1e-8):
-            state_name = comp_name
+    state = U @ np.asarray(test_states[input_name], dtype=complex)
+    overlaps = np.abs(ref_mat.conj() @ state)
+    best = int(np.argmax(overlaps))
+    state_name = ref_names[best] if overlaps[best] > 1 - 1e-8 else str(state)
 
     if state_name == output_name:
         print(f'Correct:   |{input_name:>2}> -> |{output_name:>2}>')
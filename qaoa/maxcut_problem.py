@@ -1,5 +1,4 @@
 import pennylane as qml
-import matplotlib.pyplot as plt
 
 from pennylane import numpy as np
 
@@ -25,6 +24,9 @@ For MaxCut, the objective function: C_{alpha} = 1/2 * (1 - sigma_{z}^{j} * sigma
 n_wires = 4
 graph = [(0,1), (0,3), (1,2), (2,3)]
 
+# weights to pack a sampled bitstring (most significant bit first) into an integer
+bit_weights = 1 << np.arange(n_wires - 1, -1, -1)
+
 # unitary operators
 def U_B(beta):
     for wire in range(n_wires):
@@ -38,19 +40,15 @@ def U_C(gamma):
         qml.RZ(gamma, wires=wire1)
         qml.CNOT(wires=[wire0, wire1])
 
-# define bit strings
-def bitstring_to_int(bit_string_sample):
-    bit_string = "".join(str(bs) for bs in bit_string_sample)
-    return int(bit_string, base=2)
-
 # ---------------------------------------------
 # Circuit
 # ---------------------------------------------
-dev = qml.device("lightning.qubit", wires=n_wires, shots=1)
+# cost Hamiltonian: the objective is C = sum_{alpha} 1/2 * (1 - sigma_{z}^{j} * sigma_{z}^{k}),
+# so -C = <cost_h> - m/2 and all the edges are evaluated with a single expectation value
+cost_h = qml.Hamiltonian([0.5] * len(graph), [qml.PauliZ(j) @ qml.PauliZ(k) for j, k in graph])
+
+def qaoa_ansatz(gammas, betas, n_layers=1):
 
-@qml.qnode(dev)
-def circuit(gammas, betas, edge=None, n_layers=1):
-    
     # use Hadamard gate to create |+> state
     for wire in range(n_wires):
         qml.Hadamard(wires=wire)
@@ -60,16 +58,22 @@ def circuit(gammas, betas, edge=None, n_layers=1):
         U_C(gammas[i])
         U_B(betas[i])
 
-    if edge is None:
-        return qml.sample() # the |+> sates as init
-    
-    # using PauliZ to evaluate term in the objective function using expval
-    H = qml.PauliZ(edge[0]) @ qml.PauliZ(edge[1])
-    expval = qml.expval(H)
+# analytic device to evaluate the objective function
+dev = qml.device("lightning.qubit", wires=n_wires)
 
-    # print("Circuit expectation values: {}".format(expval))
+@qml.qnode(dev)
+def circuit(gammas, betas, n_layers=1):
+    qaoa_ansatz(gammas, betas, n_layers=n_layers)
+    return qml.expval(cost_h)
 
-    return expval
+# shot-based device to sample bitstrings from the optimized circuit
+n_samples = 100
+sample_dev = qml.device("lightning.qubit", wires=n_wires, shots=n_samples)
+
+@qml.qnode(sample_dev)
+def sample_circuit(gammas, betas, n_layers=1):
+    qaoa_ansatz(gammas, betas, n_layers=n_layers)
+    return qml.sample()
 
 # ---------------------------------------------
 # Optimization
@@ -86,38 +90,35 @@ def qaoa_maxcut(n_layers=1):
     def objective(params):
         gammas = params[0]
         betas = params[1]
-        neg_obj = 0
-        for edge in graph:
-            neg_obj -= 0.5 * (1 - circuit(gammas, betas, edge=edge, n_layers=n_layers))
-            drawer = qml.draw(circuit)
-            print(drawer(gammas,betas))
-        return neg_obj
+        return circuit(gammas, betas, n_layers=n_layers) - 0.5 * len(graph)
 
     # initialize optimizer: Adagrad works well empirically
     opt = qml.AdagradOptimizer(stepsize=0.5)
 
+    # draw the circuit once, outside of the optimization loop
+    print(qml.draw(circuit)(init_params[0], init_params[1], n_layers=n_layers))
+
     # optimize parameters in objective
     params = init_params
     steps = 30
     for i in range(steps):
         params = opt.step(objective, params)
         print("Objective step {:3d}: params = {}, objective_cost = {:.5f}".format(i + 1, params, -objective(params)))
-        exit()
         # if (i + 1) % 5 == 0:
         #     print("Objective after step {:5d}: {: .7f}".format(i + 1, -objective(params)))
 
     print("-----------------------------------------------\n")
-    # sample measured bitstrings 100 times
-    bit_strings = []
-    n_samples = 100
-    for i in range(0, n_samples):
-        bitstring_to_num = bitstring_to_int(circuit(params[0], params[1], edge=None, n_layers=n_layers))
-        bit_strings.append(bitstring_to_num)
-        print("   + Sample {:3d}: param0={}, param1={}, bitstring_to_int = {}".format(i, params[0], params[1], bitstring_to_num))
+    # sample measured bitstrings 100 times in one device execution,
+    # samples has shape (n_samples, n_wires)
+    samples = np.asarray(sample_circuit(params[0], params[1], n_layers=n_layers))
+
+    # pack each row of bits into its integer value
+    bit_strings = samples.astype(np.int64) @ bit_weights
+    print("   + Sampled bitstrings to int: {}".format(bit_strings))
     print("-----------------------------------------------\n")
 
     # print optimal parameters and most frequently sampled bitstring
-    counts = np.bincount(np.array(bit_strings))
+    counts = np.bincount(bit_strings)
     most_freq_bit_string = np.argmax(counts)
     print("Optimized (gamma, beta) vectors:\n{}".format(params[:, :n_layers]))
     print("Most frequently sampled bit string is: {:04b}".format(most_freq_bit_string))
@@ -129,6 +130,8 @@ def qaoa_maxcut(n_layers=1):
 # bitstrings1 = qaoa_maxcut(n_layers=1)[1]
 # bitstrings2 = qaoa_maxcut(n_layers=2)[1]
 
+# import matplotlib.pyplot as plt
+
 # xticks = range(0, 16)
 # xtick_labels = list(map(lambda x: format(x, "04b"), xticks))
 # bins = np.arange(0, 17) - 0.5
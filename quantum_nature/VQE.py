@@ -1,10 +1,21 @@
-import matplotlib.pyplot as plt
+import hashlib
+import os
+import json
+import tempfile
+from collections import OrderedDict, namedtuple
+from importlib.metadata import version
+
 import numpy as np
 
 import qiskit_algorithms
-from qiskit_algorithms.optimizers import COBYLA
+from qiskit_algorithms.gradients import ParamShiftEstimatorGradient
+from qiskit_algorithms.optimizers import L_BFGS_B
 from qiskit_algorithms.minimum_eigensolvers import VQE, NumPyMinimumEigensolver, MinimumEigensolverResult
-from qiskit.primitives import Estimator
+from qiskit.primitives import BaseEstimator, EstimatorResult
+from qiskit.primitives.primitive_job import PrimitiveJob
+from qiskit.quantum_info import SparsePauliOp
+from qiskit_aer import AerSimulator
+from qiskit_aer.primitives import Estimator as AerEstimator
 
 from qiskit_nature import settings
 from qiskit_nature.second_q.circuit.library import HartreeFock, UCCSD
@@ -15,22 +26,103 @@ from qiskit_nature.second_q.transformers import ActiveSpaceTransformer
 settings.tensor_unwrapping = False
 settings.use_pauli_sum_op = False
 
-# create molecule
-driver = PySCFDriver(atom='Li 0 0 0; H 0 0 1.3', basis='sto3g')
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
 
-# get second quantized Hamiltonian
-problem = driver.run()
-hamiltonian = problem.hamiltonian.second_q_op()
+MoleculeData = namedtuple("MoleculeData", ["num_particles", "num_spatial_orbitals", "nuclear_repulsion_energy"])
 
-# map to qubit Hamiltonian
-qubit_mapper = ParityMapper(num_particles=problem.num_particles)
-qubit_hamiltonian = qubit_mapper.map(hamiltonian)
-print(qubit_hamiltonian.num_qubits)
+def _pauli_terms(op):
+    return [[label, coeff.real, coeff.imag] for label, coeff in op.to_list()]
+
+def _from_pauli_terms(terms):
+    return SparsePauliOp.from_list([(label, complex(re, im)) for label, re, im in terms])
+
+def build_hamiltonian(atom, basis, num_electrons, num_spatial_orbitals):
+    """Build the full and the active-space qubit Hamiltonians of a molecule.
+
+    The PySCF run and the fermion-to-qubit mapping are the expensive part of
+    the setup, so the mapped operators and the few molecule scalars the script
+    needs are stored as JSON under CACHE_DIR and reloaded on the next run with
+    the same arguments.
+
+    Args:
+        atom (str): The molecule geometry, as passed to PySCFDriver.
+        basis (str): The basis set.
+        num_electrons (int): The number of active electrons.
+        num_spatial_orbitals (int): The number of active spatial orbitals.
+
+    Returns:
+        tuple: The MoleculeData of the full problem, the full qubit
+        Hamiltonian and the active-space qubit Hamiltonian.
+    """
+
+    # the key also covers the mapping pipeline and the library versions, so a
+    # changed mapper, transformer or upgrade never loads a stale Hamiltonian
+    key = repr((
+        atom, basis, num_electrons, num_spatial_orbitals,
+        ParityMapper.__qualname__, ActiveSpaceTransformer.__qualname__,
+        [version(package) for package in ("qiskit", "qiskit-nature", "pyscf")],
+    )).encode()
+    cache_file = os.path.join(CACHE_DIR, "hamiltonian_{}.json".format(hashlib.sha1(key).hexdigest()))
+    if os.path.exists(cache_file):
+        with open(cache_file) as f:
+            cached = json.load(f)
+        molecule = MoleculeData(
+            tuple(cached["num_particles"]), cached["num_spatial_orbitals"], cached["nuclear_repulsion_energy"]
+        )
+        return molecule, _from_pauli_terms(cached["qubit_hamiltonian"]), _from_pauli_terms(cached["as_hamiltonian"])
+
+    # create molecule
+    driver = PySCFDriver(atom=atom, basis=basis)
+
+    # get second quantized Hamiltonian
+    problem = driver.run()
+    hamiltonian = problem.hamiltonian.second_q_op()
+
+    # map to qubit Hamiltonian
+    qubit_mapper = ParityMapper(num_particles=problem.num_particles)
+    qubit_hamiltonian = qubit_mapper.map(hamiltonian)
+
+    # activate space transformer
+    active_space_transformer = ActiveSpaceTransformer(num_electrons=num_electrons, num_spatial_orbitals=num_spatial_orbitals)
+    as_problem = active_space_transformer.transform(problem)
+    as_hamiltonian = qubit_mapper.map(as_problem.hamiltonian.second_q_op())
+
+    # the ElectronicStructureProblem itself does not survive a pickle round
+    # trip, so only the scalars used below are kept next to the operators
+    molecule = MoleculeData(
+        tuple(problem.num_particles), problem.num_spatial_orbitals, float(problem.nuclear_repulsion_energy)
+    )
+
+    # write to a temporary file and move it into place, so an interrupted run
+    # never leaves a truncated cache file behind
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({
+                "num_particles": list(molecule.num_particles),
+                "num_spatial_orbitals": molecule.num_spatial_orbitals,
+                "nuclear_repulsion_energy": molecule.nuclear_repulsion_energy,
+                "qubit_hamiltonian": _pauli_terms(qubit_hamiltonian),
+                "as_hamiltonian": _pauli_terms(as_hamiltonian),
+            }, f)
+        # mkstemp creates the file as 0600; give it the permissions a plain
+        # open() would, so the cache can be shared
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_file, 0o666 & ~umask)
+        os.replace(tmp_file, cache_file)
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+
+    return molecule, qubit_hamiltonian, as_hamiltonian
 
-# activate space transformer
-active_space_transformer = ActiveSpaceTransformer(num_electrons=2, num_spatial_orbitals=3)
-as_problem = active_space_transformer.transform(problem)
-as_hamiltonian = qubit_mapper.map(as_problem.hamiltonian.second_q_op())
+molecule, qubit_hamiltonian, as_hamiltonian = build_hamiltonian(
+    atom='Li 0 0 0; H 0 0 1.3', basis='sto3g', num_electrons=2, num_spatial_orbitals=3
+)
+qubit_mapper = ParityMapper(num_particles=molecule.num_particles)
+print(qubit_hamiltonian.num_qubits)
 print(as_hamiltonian.num_qubits)
 
 # exact solution
@@ -44,28 +136,129 @@ print(exact_result)
 
 # setup ansatz
 initial_state = HartreeFock(
-    num_spatial_orbitals=problem.num_spatial_orbitals,
-    num_particles=problem.num_particles,
+    num_spatial_orbitals=molecule.num_spatial_orbitals,
+    num_particles=molecule.num_particles,
     qubit_mapper=qubit_mapper
 )
 
 ansatz = UCCSD(
-    num_spatial_orbitals=problem.num_spatial_orbitals,
-    num_particles=problem.num_particles,
+    num_spatial_orbitals=molecule.num_spatial_orbitals,
+    num_particles=molecule.num_particles,
     qubit_mapper=qubit_mapper,
     initial_state=initial_state
 )
 
-# setup optimizer
-optimizer = COBYLA(maxiter=2500)
+# setup optimizer: a gradient-based optimizer needs far fewer ansatz
+# evaluations than COBYLA to converge
+optimizer = L_BFGS_B(maxiter=200)
 energies = []
 def callback(nfew, x, fx, *args):
     energies.append(fx)
 
+class CachedEstimator(BaseEstimator):
+    """Wrap an estimator and reuse the expectation values of parameter
+    vectors that have already been evaluated.
+
+    Entries are keyed on the circuit object, the Pauli terms of the
+    observable, the rounded parameter values and the run options, and the
+    least recently used entries are dropped once the cache holds maxsize
+    values.
+
+    Args:
+        estimator (BaseEstimator): The estimator that evaluates cache misses.
+        decimals (int): Parameter values are rounded to this many decimals
+            to build the cache key.
+        maxsize (int): The maximum number of cached expectation values.
+    """
+
+    def __init__(self, estimator, decimals=10, maxsize=4096):
+        super().__init__()
+        self._estimator = estimator
+        self._decimals = decimals
+        self._maxsize = maxsize
+        self._cache = OrderedDict()
+
+    @property
+    def options(self):
+        # the run options live on the wrapped estimator
+        return self._estimator.options
+
+    def set_options(self, **fields):
+        self._estimator.set_options(**fields)
+
+    def _key(self, circuit, observable, parameter_values, run_options):
+        # the circuit is identified by id(); every cache entry holds a strong
+        # reference to its circuit, so that id cannot be reused while cached
+        return (
+            id(circuit),
+            tuple(observable.to_list()),
+            tuple(np.round(parameter_values, self._decimals)),
+            tuple(sorted((name, repr(value)) for name, value in run_options.items())),
+        )
+
+    def _run(self, circuits, observables, parameter_values, **run_options):
+        job = PrimitiveJob(self._call, circuits, observables, parameter_values, **run_options)
+        # PrimitiveJob.submit became the private _submit in qiskit 1.0
+        if hasattr(job, "_submit"):
+            job._submit()
+        else:
+            job.submit()
+        return job
+
+    def _call(self, circuits, observables, parameter_values, **run_options):
+        keys = [
+            self._key(c, o, p, run_options)
+            for c, o, p in zip(circuits, observables, parameter_values)
+        ]
+
+        # only send the parameter vectors we have not seen yet, as one batch
+        misses = [i for i, key in enumerate(keys) if key not in self._cache]
+        if misses:
+            result = self._estimator.run(
+                [circuits[i] for i in misses],
+                [observables[i] for i in misses],
+                [parameter_values[i] for i in misses],
+                **run_options,
+            ).result()
+            for i, value, metadata in zip(misses, result.values, result.metadata):
+                self._cache[keys[i]] = (circuits[i], value, metadata)
+
+        for key in keys:
+            self._cache.move_to_end(key)
+        _, values, metadata = zip(*(self._cache[key] for key in keys))
+        while len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+
+        return EstimatorResult(np.array(values), [dict(m) for m in metadata])
+
 # Setup VQE
-estimator = Estimator()
-vqe_solver = VQE(estimator, ansatz, optimizer, callback=callback)
+# evaluate the ansatz with Aer, on the GPU through cuStateVec when Aer is built with GPU support;
+# single precision avoids the FP64 penalty on consumer GPUs. On CPU, the low-entanglement UCCSD
+# ansatz is simulated as a matrix product state instead of a dense statevector. With
+# approximation=True the whole SparsePauliOp is evaluated as one expectation value of the
+# simulated state, not term by term
+if "GPU" in AerSimulator().available_devices():
+    backend_options = {
+        "method": "statevector",
+        "device": "GPU",
+        "cuStateVec_enable": True,
+        "precision": "single",
+    }
+else:
+    backend_options = {
+        "method": "matrix_product_state",
+        "matrix_product_state_truncation_threshold": 1e-10,
+    }
+estimator = AerEstimator(
+    backend_options=backend_options,
+    run_options={"shots": None},
+    approximation=True,
+)
+# the shifted parameter vectors of the gradient never repeat, so the gradient
+# talks to the Aer estimator directly and only VQE's energy evaluations are cached
+gradient = ParamShiftEstimatorGradient(estimator)
+vqe_solver = VQE(CachedEstimator(estimator), ansatz, optimizer, gradient=gradient, callback=callback)
 result = vqe_solver.compute_minimum_eigenvalue(qubit_hamiltonian)
-result = problem.interpret(result)
-vqe_energy = result.total_energies[0]
+# total energy = electronic energy + nuclear repulsion, as problem.interpret would report
+vqe_energy = result.eigenvalue.real + molecule.nuclear_repulsion_energy
 
@@ -0,0 +1,26 @@
+"""Memoization shared by the codebook example scripts.
+
+Several examples evaluate the same QNode on the same small input many times.
+cached_qnode wraps such a QNode in an unbounded lru_cache, like
+functools.lru_cache(maxsize=None) would, but every call returns its own copy
+of the cached array, so a caller that modifies a result can never change what
+later calls see.
+"""
+
+from functools import lru_cache, wraps
+
+import numpy as np
+
+
+def cached_qnode(qnode):
+    """Cache the array returned by qnode for each set of hashable arguments."""
+
+    cached = lru_cache(maxsize=None)(qnode)
+
+    @wraps(qnode)
+    def wrapper(*args):
+        return np.array(cached(*args))
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
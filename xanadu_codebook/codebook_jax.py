@@ -0,0 +1,25 @@
+"""Optional jax support shared by the codebook example scripts.
+
+With jax installed, jit is jax.jit (in 64-bit mode) and INTERFACE is "jax".
+Without it, the QNodes run un-jitted on NumPy arrays: jnp is numpy, jit
+returns the function unchanged and INTERFACE is "auto". The broadcast sweeps
+in the examples work the same way in both cases.
+"""
+
+import numpy as np
+
+try:
+    import jax
+    import jax.numpy as jnp
+except ImportError:
+    jax = None
+    jnp = np
+
+if jax is not None:
+    jax.config.update("jax_enable_x64", True)
+    jit = jax.jit
+    INTERFACE = "jax"
+else:
+    def jit(func, **kwargs):
+        return func
+    INTERFACE = "auto"
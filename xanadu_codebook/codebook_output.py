@@ -0,0 +1,34 @@
+"""Buffered output shared by the codebook example scripts.
+
+The examples collect their output with emit() instead of print(). A script
+that is run directly calls write_on_exit() once; the buffer is then written
+with a single sys.stdout.write when the interpreter exits, so the output
+collected so far is kept even if the script stops on an exception.
+Set QCFS_VERBOSE=0 to run the examples without any output.
+"""
+
+import atexit
+import os
+import sys
+
+VERBOSE = bool(int(os.environ.get("QCFS_VERBOSE", "1")))
+
+_log = []
+
+
+def emit(*args, sep=" ", end="\n"):
+    """Buffer the text that print(*args, sep=sep, end=end) would write."""
+    _log.append(sep.join(map(str, args)) + end)
+
+
+def _flush():
+    if _log:
+        sys.stdout.write("".join(_log))
+        sys.stdout.flush()
+        _log.clear()
+
+
+def write_on_exit():
+    """Write the buffered output once, when the interpreter exits."""
+    if VERBOSE:
+        atexit.register(_flush)
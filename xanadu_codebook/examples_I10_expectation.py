@@ -1,7 +1,12 @@
 import pennylane as qml
 import numpy as np
 
-dev = qml.device("default.qubit", wires=1)
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
+dev = qml.device("lightning.qubit", wires=1)
 
 # -----------------------------------------------------
 # Design and run a PennyLane circuit that performs
@@ -17,10 +22,10 @@ def circuit():
 
     return qml.expval(qml.PauliY(wires=0))
 
-print('-----------------------------------------------')
-print("Checking the circuit about: |0> --Rx(pi/4)--H--Z--<Y> ")
-print(print(circuit()))
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("Checking the circuit about: |0> --Rx(pi/4)--H--Z--<Y> ")
+emit(circuit())
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # In the previous sections, we computed measurement outcome probabilities and expectation values analytically. 
@@ -38,26 +43,18 @@ shot_results = []
 shot_values = [100, 1000, 10000, 100000, 1000000]
 for shots in shot_values: 
 
-    # CREATE A DEVICE, CREATE A QNODE, AND RUN IT
-    dev = qml.device('default.qubit', wires=1, shots=shots)
-    @qml.qnode(dev)
-    def circuit():
-        qml.RX(np.pi/4, wires=0)
-        qml.Hadamard(wires=0)
-        qml.PauliZ(wires=0)
-        return qml.expval(qml.PauliY(wires=0))
-
-    # STORE RESULT IN SHOT_RESULTS ARRAY
-    shot_results.append(circuit())
+    # RUN THE QNODE ABOVE WITH THE GIVEN NUMBER OF SHOTS AND STORE
+    # THE RESULT IN SHOT_RESULTS ARRAY
+    shot_results.append(circuit(shots=shots))
 
-print('-----------------------------------------------')
-print(qml.math.unwrap(shot_results))
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit(qml.math.unwrap(shot_results))
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Try to access the samples directly
 # -----------------------------------------------------
-dev = qml.device("default.qubit", wires=1, shots=100000)
+# the same device as above; the 100000 shots are given when calling the QNode
 @qml.qnode(dev)
 def circuit():
     qml.RX(np.pi/4, wires=0)
@@ -79,30 +76,31 @@ def compute_expval_from_samples(samples):
         float: the expectation value computed based on samples.
     """
 
-    estimated_expval = 0
-    count_plus_1 = np.count_nonzero(samples == 1)
-    count_minus_1 = np.count_nonzero(samples == -1)
-    sum_plus_and_minus_1 = count_minus_1 + count_plus_1
-    assert(sum_plus_and_minus_1 == len(samples))
-
-    # USE THE SAMPLES TO ESTIMATE THE EXPECTATION VALUE
-    estimated_expval = (1*count_plus_1 + (-1)*count_minus_1) / len(samples)
+    # USE THE SAMPLES TO ESTIMATE THE EXPECTATION VALUE: since the outcomes
+    # are 1 and -1, the expectation value is the mean of the samples
+    estimated_expval = float(np.mean(samples))
 
     return estimated_expval
 
-print('-----------------------------------------------')
-samples = circuit()
-print("Array of the obtained samples: ")
-print(samples)
-print("Expval: ")
-print(compute_expval_from_samples(samples))
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+samples = circuit(shots=100000)
+emit("Array of the obtained samples: ")
+emit(samples)
+emit("Expval: ")
+emit(compute_expval_from_samples(samples))
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # The relationship between variance and shots: to explore how the accuracy of 
 # the expectation value depends on the number of shots
 # -----------------------------------------------------
 
+# the number of shots is given when calling the QNode
+@qml.qnode(dev)
+def hadamard_z_samples():
+    qml.Hadamard(wires=0)
+    return qml.sample(qml.PauliZ(wires=0))
+
 def variance_experiment(n_shots):
     """Run an experiment to determine the variance in an expectation
     value computed with a given number of shots.
@@ -117,27 +115,16 @@ def variance_experiment(n_shots):
 
     # To obtain a variance, we run the circuit multiple times at each shot value.
     n_trials = 100
-    n_results = []
 
     ##################
     # YOUR CODE HERE #
     ##################
 
-    # CREATE A DEVICE WITH GIVEN NUMBER OF SHOTS
-    dev = qml.device("default.qubit", wires=1, shots=n_shots)
+    # RUN ALL N_TRIALS IN ONE EXECUTION, THEN SPLIT THE SAMPLES PER TRIAL
+    samples = np.asarray(hadamard_z_samples(shots=n_trials * n_shots)).reshape(n_trials, n_shots)
 
-    # DECORATE THE CIRCUIT BELOW TO CREATE A QNODE
-    @qml.qnode(dev)
-    def circuit():
-        qml.Hadamard(wires=0)
-        return qml.expval(qml.PauliZ(wires=0))
-
-    # RUN THE QNODE N_TRIALS TIMES AND RETURN THE VARIANCE OF THE RESULTS
-    for t in range(n_trials): 
-        expval = circuit()
-        n_results.append(expval)
-    
-    return np.var(n_results)
+    # RETURN THE VARIANCE OF THE PER-TRIAL EXPECTATION VALUES
+    return np.var(samples.mean(axis=1))
 
 
 def variance_scaling(n_shots):
@@ -168,14 +155,14 @@ def variance_scaling(n_shots):
 shot_vals = [10, 20, 40, 100, 200, 400, 1000, 2000, 4000]
 
 # Used to plot your results
-print('-----------------------------------------------')
+emit('-----------------------------------------------')
 results_experiment = [variance_experiment(shots) for shots in shot_vals]
-print("Array of results_experiment: ")
-print(results_experiment)
+emit("Array of results_experiment: ")
+emit(results_experiment)
 
 results_scaling = [variance_scaling(shots) for shots in shot_vals]
-print("Array of results_scaling: ")
-print(results_scaling)
-print('-----------------------------------------------\n')
+emit("Array of results_scaling: ")
+emit(results_scaling)
+emit('-----------------------------------------------\n')
 
-# plot = plotter(shot_vals, results_experiment, results_scaling)
\ No newline at end of file
+# plot = plotter(shot_vals, results_experiment, results_scaling)
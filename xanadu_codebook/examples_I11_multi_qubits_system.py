@@ -1,12 +1,26 @@
 import pennylane as qml
 import numpy as np
 
+from codebook_cache import cached_qnode
+from codebook_jax import jit, jnp, INTERFACE
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
 # -----------------------------------------------------
 # Multi-qubit system
 # -----------------------------------------------------
 
-dev = qml.device('default.qubit', wires=3)
-@qml.qnode(dev)
+DEV2 = qml.device('lightning.qubit', wires=2)
+DEV3 = qml.device('lightning.qubit', wires=3)
+
+# tensor-product observables, built once and reused by every QNode call
+OBS_ZX = qml.PauliZ(0) @ qml.PauliX(1)
+OBS_ZZ = qml.PauliZ(0) @ qml.PauliZ(1)
+
+@cached_qnode
+@qml.qnode(DEV3)
 def make_basis_state(basis_id):
     """Produce the 3-qubit basis state corresponding to |basis_id>.
     
@@ -19,38 +33,26 @@ def make_basis_state(basis_id):
         array[complex]: The computational basis state |basis_id>.
     """
 
-    # convert to binary
-    basis_id_binary = np.base_repr(basis_id).zfill(3)
-    print(basis_id_binary)
-    
-    # convert binary string to list
-    list_basis_id = list(basis_id_binary)
-    print(list_basis_id)
-    
-    # convert list to integer values
-    final_list = [int(x) for x in list_basis_id]
-    print(final_list)
+    # get the bits of basis_id, wire 0 holds the most significant bit
+    bits = np.array([(basis_id >> k) & 1 for k in range(2, -1, -1)], dtype=np.int8)
 
     # prepare the correct computational basis state
-    for i in range(len(final_list)):
-        if final_list[i] == 1:
-            qml.PauliX(wires=i)
+    qml.BasisState(bits, wires=[0, 1, 2])
     
     return qml.state()
 
 basis_id = 3
 
-print('-----------------------------------------------')
-print('Make basis state:')
-print(f"Output state = {make_basis_state(basis_id)}")
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit('Make basis state:')
+emit(f"Output state = {make_basis_state(basis_id)}")
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Create a state: |+1> = |+> dotproduct |1>, and return
 # the measurments with Y and Z
 # -----------------------------------------------------
-dev = qml.device('default.qubit', wires=2)
-@qml.qnode(dev)
+@qml.qnode(DEV2)
 def two_qubit_circuit():
 
     # PREPARE |+>|1>
@@ -60,17 +62,16 @@ def two_qubit_circuit():
     # RETURN TWO EXPECTATION VALUES, Y ON FIRST QUBIT, Z ON SECOND QUBIT
     return (qml.expval(qml.PauliY(0)), qml.expval(qml.PauliZ(1)))
 
-print('-----------------------------------------------')
-print('two_qubit_circuit:')
-print(two_qubit_circuit())
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit('two_qubit_circuit:')
+emit(two_qubit_circuit())
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Create a state: |1-> = |1> dotproduct |->, and return
 # the measurments with Y and Z
 # -----------------------------------------------------
-dev = qml.device("default.qubit", wires=2)
-@qml.qnode(dev)
+@qml.qnode(DEV2)
 def create_one_minus():
 
     # Prepare |1>|->
@@ -79,12 +80,12 @@ def create_one_minus():
     qml.Hadamard(wires=1)
 
     # Return expected value of Z \otimes X
-    return qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
+    return qml.expval(OBS_ZX)
 
-print('-----------------------------------------------')
-print('create_one_minus:')
-print(create_one_minus())
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit('create_one_minus:')
+emit(create_one_minus())
+emit('-----------------------------------------------\n')
 
 
 # -----------------------------------------------------
@@ -93,13 +94,13 @@ print('-----------------------------------------------\n')
 #           |0> --Rx(2phi)--<Z>
 #   + ver2: Z tensorproduct Z
 # -----------------------------------------------------
-dev = qml.device('default.qubit', wires=2)
-@qml.qnode(dev)
+@jit
+@qml.qnode(DEV2, interface=INTERFACE)
 def circuit_1(theta):
     """Implement the circuit and measure Z I and I Z.
     
     Args:
-        theta (float): a rotation angle.
+        theta (float or array[float]): a rotation angle, or a batch of angles.
         
     Returns:
         float, float: The expectation values of the observables Z I, and I Z
@@ -110,12 +111,13 @@ def circuit_1(theta):
     return (qml.expval(qml.PauliZ(0)), qml.expval(qml.PauliZ(1)))
 
 
-@qml.qnode(dev)
+@jit
+@qml.qnode(DEV2, interface=INTERFACE)
 def circuit_2(theta):
     """Implement the circuit and measure Z Z.
     
     Args:
-        theta (float): a rotation angle.
+        theta (float or array[float]): a rotation angle, or a batch of angles.
         
     Returns:
         float: The expectation value of the observable Z Z
@@ -124,7 +126,7 @@ def circuit_2(theta):
     qml.RX(theta, wires=0)
     qml.RY(2*theta, wires=1)  
  
-    return qml.expval(qml.PauliZ(0) @ qml.PauliZ(1))
+    return qml.expval(OBS_ZZ)
 
 
 def zi_iz_combination(ZI_results, IZ_results):
@@ -142,32 +144,29 @@ def zi_iz_combination(ZI_results, IZ_results):
         produces results equivalent to measuring ZZ.
     """
 
-    combined_results = np.zeros(len(ZI_results))
-    
     return ZI_results * IZ_results
 
-theta = np.linspace(0, 2 * np.pi, 100)
+theta = jnp.linspace(0, 2 * jnp.pi, 100)
 
-# Run circuit 1, and process the results
-circuit_1_results = np.array([circuit_1(t) for t in theta])
-ZI_results = circuit_1_results[:, 0]
-IZ_results = circuit_1_results[:, 1]
+# Run circuit 1 over all the angles at once: the gate parameters are
+# broadcast over theta, so the sweep is a single QNode call
+ZI_results, IZ_results = circuit_1(theta)
 
-print('-----------------------------------------------')
-print('circuit_1_results:')
-print(ZI_results)
-print(IZ_results)
+emit('-----------------------------------------------')
+emit('circuit_1_results:')
+emit(ZI_results)
+emit(IZ_results)
 
 combined_results = zi_iz_combination(ZI_results, IZ_results)
-print('combined_circuit_1_results:')
-print(combined_results)
-print('-----------------------------------------------')
+emit('combined_circuit_1_results:')
+emit(combined_results)
+emit('-----------------------------------------------')
 
 # Run circuit 2
-ZZ_results = np.array([circuit_2(t) for t in theta])
-print('ZZ_results:')
-print(ZZ_results)
-print('-----------------------------------------------\n')
+ZZ_results = circuit_2(theta)
+emit('ZZ_results:')
+emit(ZZ_results)
+emit('-----------------------------------------------\n')
 
 # Plot your results
-# plot = plotter(theta, ZI_results, IZ_results, ZZ_results, combined_results)
\ No newline at end of file
+# plot = plotter(theta, ZI_results, IZ_results, ZZ_results, combined_results)
@@ -1,16 +1,26 @@
 import pennylane as qml
 import numpy as np
 
+from functools import lru_cache
+
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
 # -----------------------------------------------------
 # Check CZ by different ways to implement
 # -----------------------------------------------------
 
-dev = qml.device("default.qubit", wires=2)
+DEV2 = qml.device('lightning.qubit', wires=2)
+DEV3 = qml.device('lightning.qubit', wires=3)
+DEV4 = qml.device('lightning.qubit', wires=4)
+DEV5 = qml.device('lightning.qubit', wires=5)
 
 # Prepare a two-qubit state; change up the angles if you like
 phi, theta, omega = 1.2, 2.3, 3.4
 
-@qml.qnode(device=dev)
+@qml.qnode(device=DEV2)
 def prepare_states(phi, theta, omega):
     
     # Apply rotation gate on the first qubit
@@ -22,7 +32,7 @@ def prepare_states(phi, theta, omega):
 
     return qml.state()
 
-@qml.qnode(device=dev)
+@qml.qnode(device=DEV2)
 def true_cz(phi, theta, omega):
     prepare_states(phi, theta, omega)
 
@@ -32,7 +42,7 @@ def true_cz(phi, theta, omega):
     return qml.state()
 
 
-@qml.qnode(dev)
+@qml.qnode(DEV2)
 def imposter_cz(phi, theta, omega):
     prepare_states(phi, theta, omega)
 
@@ -43,22 +53,20 @@ def imposter_cz(phi, theta, omega):
     
     return qml.state()
 
-print('-----------------------------------------------')
-print(f"True CZ output state {true_cz(phi, theta, omega)}")
-print(f"Imposter CZ output state {imposter_cz(phi, theta, omega)}")
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit(f"True CZ output state {true_cz(phi, theta, omega)}")
+emit(f"Imposter CZ output state {imposter_cz(phi, theta, omega)}")
+emit('-----------------------------------------------\n')
 
 
 # -----------------------------------------------------
 # Check SWAP by different ways to implement
 # -----------------------------------------------------
 
-dev = qml.device("default.qubit", wires=2)
-
 # Prepare a two-qubit state; change up the angles if you like
 phi, theta, omega = 0.2, 2.0, 1.5
 
-@qml.qnode(dev)
+@qml.qnode(DEV2)
 def apply_swap(phi, theta, omega):
     prepare_states(phi, theta, omega)
 
@@ -67,7 +75,7 @@ def apply_swap(phi, theta, omega):
 
     return qml.state()
 
-@qml.qnode(dev)
+@qml.qnode(DEV2)
 def apply_swap_with_cnots(phi, theta, omega):
     prepare_states(phi, theta, omega)
 
@@ -78,21 +86,19 @@ def apply_swap_with_cnots(phi, theta, omega):
 
     return qml.state()
 
-print('-----------------------------------------------')
-print(f"Regular SWAP state = {apply_swap(phi, theta, omega)}")
-print(f"CNOT SWAP state = {apply_swap_with_cnots(phi, theta, omega)}")
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit(f"Regular SWAP state = {apply_swap(phi, theta, omega)}")
+emit(f"CNOT SWAP state = {apply_swap_with_cnots(phi, theta, omega)}")
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Check Toffoli gate
 # -----------------------------------------------------
 
-dev = qml.device("default.qubit", wires=3)
-
 # Prepare first qubit in |1>, and arbitrary states on the second two qubits
 phi, theta, omega = 1.2, 2.3, 3.4
 
-@qml.qnode(dev)
+@qml.qnode(DEV3)
 def prepare_arbitrary_states(phi, theta, omega):
     # Prepare the first qubit in the |1⟩ state
     qml.PauliX(wires=0)
@@ -109,12 +115,12 @@ def prepare_arbitrary_states(phi, theta, omega):
 
 # A helper function just so you can visualize the initial state
 # before the controlled SWAP occurs.
-@qml.qnode(dev)
+@qml.qnode(DEV3)
 def no_swap(phi, theta, omega):
     prepare_arbitrary_states(phi, theta, omega)
     return qml.state()
 
-@qml.qnode(dev)
+@qml.qnode(DEV3)
 def controlled_swap(phi, theta, omega):
     prepare_arbitrary_states(phi, theta, omega)
 
@@ -125,19 +131,31 @@ def controlled_swap(phi, theta, omega):
 
     return qml.state()
 
-print('-----------------------------------------------')
-print(f"No SWAP state = {no_swap(phi, theta, omega)}")
-print(f"Controlled SWAP state = {controlled_swap(phi, theta, omega)}")
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit(f"No SWAP state = {no_swap(phi, theta, omega)}")
+emit(f"Controlled SWAP state = {controlled_swap(phi, theta, omega)}")
+emit('-----------------------------------------------\n')
 
 
 # -----------------------------------------------------
 # MulticontrolledX gate
 # -----------------------------------------------------
 
-dev = qml.device('default.qubit', wires=4)
+@lru_cache(maxsize=None)
+def mcx_matrix(control_values):
+    """Matrix of the 3-controlled X on wires [0, 1, 2, 3], built once per control string."""
+    # build the gate off the record, so it is never queued onto a tape
+    with qml.QueuingManager.stop_recording():
+        mcx = qml.MultiControlledX(control_wires=[0,1,2], wires=3, control_values=control_values)
+    matrix = np.asarray(qml.matrix(mcx), dtype=np.complex128)
+
+    # the cached array is shared between calls, so keep it read-only
+    matrix.flags.writeable = False
+    return matrix
+
+MCX_001 = mcx_matrix("001")
 
-@qml.qnode(dev)
+@qml.qnode(DEV4)
 def four_qubit_mcx():
 
     # IMPLEMENT THE CIRCUIT ABOVE USING A 4-QUBIT MULTI-CONTROLLED X
@@ -145,14 +163,15 @@ def four_qubit_mcx():
     qml.Hadamard(wires=1)
     qml.Hadamard(wires=2)
 
-    qml.MultiControlledX(control_wires=[0,1,2], wires=3, control_values="001")
+    # the control string is fixed, so apply the precomputed 16x16 matrix
+    qml.QubitUnitary(MCX_001, wires=[0,1,2,3])
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("MultiControlledX state:")
-print(four_qubit_mcx())
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("MultiControlledX state:")
+emit(four_qubit_mcx())
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Using only Toffoli gates to implement the 3-controlled-NOT
@@ -162,8 +181,7 @@ print('-----------------------------------------------\n')
 # Wire 3 is the auxiliary qubit
 # Wire 4 is the target 
 
-dev = qml.device('default.qubit', wires=5)
-@qml.qnode(dev)
+@qml.qnode(DEV5)
 def four_qubit_mcx_only_tofs():
     # We will initialize the control qubits in state |1> so you can see
     # how the output state gets changed.
@@ -184,7 +202,7 @@ def four_qubit_mcx_only_tofs():
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("Four qubits MCX only using Toffolis:")
-print(four_qubit_mcx_only_tofs())
-print('-----------------------------------------------\n')
\ No newline at end of file
+emit('-----------------------------------------------')
+emit("Four qubits MCX only using Toffolis:")
+emit(four_qubit_mcx_only_tofs())
+emit('-----------------------------------------------\n')
@@ -1,108 +1,82 @@
 import pennylane as qml
 import numpy as np
 
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
+DEV2 = qml.device('lightning.qubit', wires=2)
+DEV3 = qml.device('lightning.qubit', wires=3)
+
 # -----------------------------------------------------
 # Bell states include 4 states that form the Bell basis
 # -----------------------------------------------------
 
-dev = qml.device('default.qubit', wires=2)
-
 # Starting from the state |00>, implement a PennyLane circuit
 # to construct each of the Bell basis states.
 
-@qml.qnode(dev)
-def prepare_psi_plus():
+@qml.qnode(DEV2)
+def prepare_bell_state(basis_id):
+    """Prepare the Bell state obtained from the basis state |basis_id>.
 
-    # PREPARE (1/sqrt(2)) (|00> + |11>)
-    # we use Hadamard and CNOT
-    qml.Hadamard(wires=0)
-    qml.CNOT(wires=[0,1])
-    return qml.state()
+    Args:
+        basis_id (int): An integer value identifying the 2-qubit basis state
+            the Hadamard and CNOT are applied to.
 
-@qml.qnode(dev)
-def prepare_psi_minus():
+    Returns:
+        array[complex]: The resulting Bell state.
+    """
 
-    # PREPARE (1/sqrt(2)) (|00> - |11>)
-    # we use PauliX to prepare |1>, then 
-    # use Hadamard and CNOT for the state
-    qml.PauliX(wires=0)
+    # |00> -> (1/sqrt(2)) (|00> + |11>)
+    # |10> -> (1/sqrt(2)) (|00> - |11>)
+    # |01> -> (1/sqrt(2)) (|01> + |10>)
+    # |11> -> (1/sqrt(2)) (|01> - |10>)
+    qml.BasisState(np.array([basis_id // 2, basis_id % 2]), wires=[0, 1])
     qml.Hadamard(wires=0)
     qml.CNOT(wires=[0,1])
     return qml.state()
 
-@qml.qnode(dev)
-def prepare_phi_plus():
-
-    # PREPARE  (1/sqrt(2)) (|01> + |10>)
-    # change the control and target wires with CNOT
-    qml.PauliX(wires=0)
-    qml.Hadamard(wires=1)
-    qml.CNOT(wires=[1,0])
-    return qml.state()
-
-@qml.qnode(dev)
-def prepare_phi_minus():
-
-    # PREPARE  (1/sqrt(2)) (|01> - |10>)
-    qml.PauliX(wires=1)
-    qml.Hadamard(wires=1)
-    qml.PauliX(wires=0)
-    qml.PauliX(wires=1)
-    qml.CNOT(wires=[1,0])
-    return qml.state()
+psi_plus = prepare_bell_state(0)
+psi_minus = prepare_bell_state(2)
+phi_plus = prepare_bell_state(1)
+phi_minus = prepare_bell_state(3)
 
-psi_plus = prepare_psi_plus()
-psi_minus = prepare_psi_minus()
-phi_plus = prepare_phi_plus()
-phi_minus = prepare_phi_minus()
-
-print('-----------------------------------------------')
-print('The Bell states:')
-print(f"|ψ_+> = {psi_plus}")
-print(f"|ψ_-> = {psi_minus}")
-print(f"|ϕ_+> = {phi_plus}")
-print(f"|ϕ_-> = {phi_minus}")
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit('The Bell states:')
+emit(f"|ψ_+> = {psi_plus}")
+emit(f"|ψ_-> = {psi_minus}")
+emit(f"|ϕ_+> = {phi_plus}")
+emit(f"|ϕ_-> = {phi_minus}")
+emit('-----------------------------------------------\n')
 
 
 # -----------------------------------------------------
 # A quantum multiplexer and uniformly controlled rotation
 # -----------------------------------------------------
 
-dev = qml.device("default.qubit", wires=3)
-
 # State of first 2 qubits
 state = [0, 1]
 
-@qml.qnode(device=dev)
+# operations applied to the third qubit for the control states 00, 01, 10, 11
+multiplexer_ops = [qml.Identity(2), qml.PauliX(2), qml.PauliZ(2), qml.PauliY(2)]
+
+@qml.qnode(device=DEV3)
 def apply_control_sequence(state):
-    # Set up initial state of the first two qubits
-    if state[0] == 1:
-        qml.PauliX(wires=0)
-    if state[1] == 1:
-        qml.PauliX(wires=1) 
-
-    # Set up initial state of the third qubit - use |->
-    # so we can see the effect on the output
-    qml.PauliX(wires=2)
+    # Set up initial state of the first two qubits, and of the third
+    # qubit - use |-> = H|1> so we can see the effect on the output
+    qml.BasisState(np.array([state[0], state[1], 1]), wires=[0,1,2])
     qml.Hadamard(wires=2)
     
     # IMPLEMENT THE MULTIPLEXER
-
     # IF STATE OF FIRST TWO QUBITS IS 01, APPLY X TO THIRD QUBIT
-    qml.MultiControlledX(control_wires=[0,1], wires=2, control_values="01")
-    
     # IF STATE OF FIRST TWO QUBITS IS 10, APPLY Z TO THIRD QUBIT
-    Z = np.matrix([[1,0], [0,-1]])
-    qml.ControlledQubitUnitary(Z, control_wires=[0,1], wires=2, control_values="10")
-
     # IF STATE OF FIRST TWO QUBITS IS 11, APPLY Y TO THIRD QUBIT
-    Y = np.matrix([[0,-1j],[1j,0]])
-    qml.ControlledQubitUnitary(Y, control_wires=[0,1], wires=2, control_values="11")
+    qml.Select(multiplexer_ops, control=[0,1])
     
     return qml.state()
     
-print('-----------------------------------------------')
-print('The quantum multiplexer and uniformly controlled rotation:')
-print(apply_control_sequence(state))
-print('-----------------------------------------------\n')
\ No newline at end of file
+emit('-----------------------------------------------')
+emit('The quantum multiplexer and uniformly controlled rotation:')
+emit(apply_control_sequence(state))
+emit('-----------------------------------------------\n')
@@ -1,27 +1,35 @@
 import pennylane as qml
 import numpy as np
 
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
 # -----------------------------------------------------
 # Quantum teleportation
 # -----------------------------------------------------
 
-dev = qml.device('default.qubit', wires=3)
+dev = qml.device('lightning.qubit', wires=3)
+
+# H followed by Rot(0.1, 0.2, 0.3), fused into one constant unitary
+PREP_U = qml.matrix(qml.Rot(0.1, 0.2, 0.3, wires=0)) @ qml.matrix(qml.Hadamard(wires=0))
+PREP_U.flags.writeable = False
 
 def state_preparation():
 
     # OPTIONALLY UPDATE THIS STATE PREPARATION ROUTINE
-    qml.Hadamard(wires=0)
-    qml.Rot(0.1, 0.2, 0.3, wires=0)
+    qml.QubitUnitary(PREP_U, wires=0)
 
 @qml.qnode(dev)
 def state_prep_only():
     state_preparation()
     return qml.state()
     
-print('-----------------------------------------------')
-print('State_preparation:')
-print(state_prep_only())
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit('State_preparation:')
+emit(state_prep_only())
+emit('-----------------------------------------------\n')
 
 def entangle_qubits():
 
@@ -39,8 +47,9 @@ def rotate_and_controls():
     qml.CNOT(wires = [1,2])
     qml.CZ(wires = [0,2])
 
-@qml.qnode(dev)
-def teleportation():
+# record the protocol once and simplify the tape once, instead of
+# re-tracing the quantum functions on every call
+with qml.queuing.AnnotatedQueue() as q:
 
     # USE YOUR QUANTUM FUNCTIONS TO IMPLEMENT QUANTUM TELEPORTATION
     state_preparation()
@@ -48,12 +57,19 @@ def teleportation():
     rotate_and_controls()
 
     # RETURN THE STATE
-    return qml.state()
+    qml.state()
+
+TELEPORTATION_TAPE = qml.tape.QuantumScript.from_queue(q)
+TELEPORTATION_TAPE = qml.transforms.merge_rotations(TELEPORTATION_TAPE)[0][0]
+TELEPORTATION_TAPE = qml.transforms.cancel_inverses(TELEPORTATION_TAPE)[0][0]
 
-print('-----------------------------------------------')
-print('Quantum teleportation:')
-print(teleportation())
-print('-----------------------------------------------\n')
+def teleportation():
+    return qml.execute([TELEPORTATION_TAPE], dev)[0]
+
+emit('-----------------------------------------------')
+emit('Quantum teleportation:')
+emit(teleportation())
+emit('-----------------------------------------------\n')
 
 def extract_qubit_state(input_state):
     """Extract the state of the third qubit from the combined state after teleportation.
@@ -67,27 +83,12 @@ def extract_qubit_state(input_state):
         array[complex]: The state vector np.array([a, b]) of the third qubit.
     """
 
-    a = 2 * input_state[0]
-    b = 2 * input_state[1]
-    
-    return np.array([a,b])
-
-# OPTIONALLY UPDATE THIS STATE PREPARATION ROUTINE
-def state_preparation():
-    qml.Hadamard(wires=0)
-    qml.Rot(0.1, 0.2, 0.3, wires=0)
-
-
-@qml.qnode(dev)
-def teleportation():
-    state_preparation()
-    entangle_qubits()
-    rotate_and_controls()    
-    return qml.state()
+    # the first two amplitudes are a/2 and b/2
+    return 2.0 * np.asarray(input_state[:2])
 
 # Print the extracted state after teleportation
-print('-----------------------------------------------')
-print('Extracting the state after teleportation:')
+emit('-----------------------------------------------')
+emit('Extracting the state after teleportation:')
 full_state = teleportation()
-print(extract_qubit_state(full_state))
-print('-----------------------------------------------\n')
+emit(extract_qubit_state(full_state))
+emit('-----------------------------------------------\n')
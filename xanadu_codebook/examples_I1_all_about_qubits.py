@@ -1,9 +1,68 @@
 import numpy as np
 import cmath
 
+from functools import lru_cache, wraps
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional: without it the kernels below run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    import jax
+    import jax.numpy as jnp
+except ImportError:
+    # jax is optional: quantum_algorithm_jax is only defined when it is installed
+    jax = None
+
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
+# one PCG64 generator for the whole module, instead of a new one per call
+_RNG = np.random.default_rng()
+
+def _memoize(func):
+    """Memoize a pure state function; array arguments (lists and tuples are
+    converted with np.asarray) are keyed on their shape, dtype and bytes.
+
+    Every call returns a fresh copy, so callers may modify the result freely.
+    """
+
+    def to_key(a):
+        if isinstance(a, (list, tuple)):
+            a = np.asarray(a)
+        if isinstance(a, np.ndarray):
+            return ("array", a.shape, a.dtype.str, np.ascontiguousarray(a).tobytes())
+        return a
+
+    def from_key(k):
+        if isinstance(k, tuple) and k and k[0] == "array":
+            return np.frombuffer(k[3], dtype=k[2]).reshape(k[1])
+        return k
+
+    @lru_cache(maxsize=256)
+    def cached(args, kwargs):
+        return func(*map(from_key, args), **{name: from_key(k) for name, k in kwargs})
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key_args = tuple(map(to_key, args))
+        key_kwargs = tuple(sorted((name, to_key(a)) for name, a in kwargs.items()))
+        return cached(key_args, key_kwargs).copy()
+
+    return wrapper
+
 # Here are the vector representations of |0> and |1>, for convenience
 
-def normalize_state(alpha, beta):
+@_memoize
+@njit("complex64[::1](complex128, complex128)", cache=True, fastmath=True)
+def normalize_state(alpha: complex, beta: complex) -> np.ndarray:
     """Compute a normalized quantum state given arbitrary amplitudes.
     
     Args:
@@ -15,20 +74,24 @@ def normalize_state(alpha, beta):
         a normalized quantum state.
     """
 
+    # the norm is real; multiply by its inverse instead of dividing twice.
+    # The amplitudes arrive as complex128, so cast them to complex64 first:
+    # complex128 * float32 would otherwise be computed in double precision
     N_conj = alpha*alpha.conjugate() + beta*beta.conjugate()
-    N = np.sqrt(N_conj)
+    inv_N = np.float32(1.0 / np.sqrt(N_conj.real))
 
-    norm_alpha = alpha / N
-    norm_beta = beta / N
+    norm_alpha = np.complex64(alpha) * inv_N
+    norm_beta = np.complex64(beta) * inv_N
 
     # create the vector which is normalized
-    vec_result = np.array([norm_alpha, norm_beta])
+    vec_result = np.array([norm_alpha, norm_beta], dtype=np.complex64)
     
     # return the normalized vector
     return vec_result
 
 
-def inner_product(state_1, state_2):
+@njit(cache=True, fastmath=True)
+def inner_product(state_1: np.ndarray, state_2: np.ndarray) -> complex:
     """Compute the inner product between two states.
     
     Args:
@@ -39,15 +102,11 @@ def inner_product(state_1, state_2):
         complex: The value of the inner product <state_1 | state_2>.
     """
  
-    bra_state1 = state_1.conjugate()
-
-    # compute the inner product
-    inn_prod = bra_state1 @ state_2
-    
-    return inn_prod
+    # compute the inner product; vdot conjugates its first argument
+    return np.vdot(state_1, state_2)
 
 
-def measure_state(state, num_meas):
+def measure_state(state: np.ndarray, num_meas: int) -> np.ndarray:
     """Simulate a quantum measurement process.
 
     Args:
@@ -59,29 +118,54 @@ def measure_state(state, num_meas):
         distribution defined by the input state.
     """
 
-    # normalize the states
-    norm_state = normalize_state(state[0], state[1])
+    # normalize the state, unless it already is (e.g. the output of apply_u)
+    state = np.asarray(state, dtype=np.complex64)
+    norm2 = (state.conj() * state).real.sum()
+    norm_state = state if abs(norm2 - 1.0) < 1e-6 else state / np.sqrt(norm2)
     # print(norm_state)
 
-    # calculate the probabilities
-    prob_distribution = norm_state * norm_state
+    # calculate the probabilities |alpha|^2 and |beta|^2
+    prob_distribution = (norm_state.conj() * norm_state).real
     # print(prob_distribution)
     
-    # compute the measurement probabilities
-    measurement_outcomes = []
-    for i in range(num_meas):
-        random_number = np.random.random()  # generate a random number between 0 and 1
-        outcome = 0 if random_number < prob_distribution[0] else 1
-        measurement_outcomes.append(outcome)
-
-    # return a list of measurement
+    # inverse-CDF sampling: for one qubit the CDF lookup is a single compare
+    # of each uniform against p(0), done branch-free for all samples at once
+    u = _RNG.random(num_meas)
+    measurement_outcomes = (u >= prob_distribution[0]).view(np.int8)
+
+    # return the array of measurements
     # print(measurement_outcomes)
  
     return measurement_outcomes
 
-U = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+def measure_state_exact(state: np.ndarray) -> np.ndarray:
+    """Compute the exact measurement distribution of a qubit state.
+
+    Use this instead of measure_state when the outcome probabilities are all
+    that is needed; sampling adds shot noise and RNG cost.
+
+    Args:
+        state (array[complex]): A qubit state vector.
+
+    Returns:
+        array[float]: The probabilities of measuring 0 and 1.
+    """
+
+    state = np.asarray(state, dtype=np.complex64)
+    prob_distribution = (state.conj() * state).real
+
+    return prob_distribution / prob_distribution.sum()
+
+# a float32 scalar keeps U complex64; a float64 one would promote it to
+# complex128 under NumPy 2 (NEP 50)
+INV_SQRT2 = np.float32(1.0 / np.sqrt(2.0))
+U = np.ascontiguousarray(np.array([[1, 1], [1, -1]], dtype=np.complex64) * INV_SQRT2)
+# the four entries of U as scalars, so apply_u needs no matrix-vector call
+U00, U01, U10, U11 = U.ravel()
 # U = np.array([[0, 1], [1, 0]])
-def apply_u(state):
+@_memoize
+@njit(cache=True, fastmath=True)
+def apply_u(state: np.ndarray) -> np.ndarray:
     """Apply a quantum operation.
 
     Args:
@@ -91,22 +175,24 @@ def apply_u(state):
         array[complex]: The output state after applying U.
     """
 
-    outcome_state = U @ state
+    s0, s1 = state[0], state[1]
+    outcome_state = np.array([U00*s0 + U01*s1, U10*s0 + U11*s1])
     
     return outcome_state
 
-def initialize_state():
+@_memoize
+def initialize_state() -> np.ndarray:
     """Prepare a qubit in state |0>.
     
     Returns:
         array[float]: the vector representation of state |0>.
     """
 
-    qubit_state0 = np.array([1, 0], dtype=complex)
+    qubit_state0 = np.array([1, 0], dtype=np.complex64)
     
     return qubit_state0
 
-def quantum_algorithm():
+def quantum_algorithm() -> np.ndarray:
     """Use the functions above to implement the quantum algorithm described above.
     
     Try and do so using three lines of code or less!
@@ -117,52 +203,76 @@ def quantum_algorithm():
 
     # initialize a qubit in state 0
     qubit_state = initialize_state()
-    print("- Init a qubit at state |0>: ", qubit_state)
+    emit("- Init a qubit at state |0>: ", qubit_state)
 
     # apply U gate
     appU_state = apply_u(qubit_state)
-    print("- Apply U gate to the sate: ", appU_state)
+    emit("- Apply U gate to the sate: ", appU_state)
 
     # simulate measuring the qubit 100 times
     meas_outcome = measure_state(appU_state, 100)
-    print("- Outcome after 100x measurements: ", meas_outcome)
+    emit("- Outcome after 100x measurements: ", meas_outcome)
+    emit("- Exact outcome probabilities: ", measure_state_exact(appU_state))
 
     return meas_outcome
 
+if jax is not None:
+
+    U_JAX = jnp.asarray(U, dtype=jnp.complex64)
+
+    @jax.jit
+    def quantum_algorithm_jax(key):
+        """Compiled version of quantum_algorithm: prepare |0>, apply U and draw 100 samples.
+
+        Args:
+            key (jax.random.PRNGKey): The random key used for the measurements.
+
+        Returns:
+            array[int]: the measurement results after running the algorithm 100 times
+        """
+
+        qubit_state = jnp.array([1, 0], dtype=jnp.complex64)
+        appU_state = U_JAX @ qubit_state
+        probs = jnp.abs(appU_state) ** 2
+
+        return jax.random.categorical(key, jnp.log(probs), shape=(100,))
+
 alpha = complex(2.0, 1.0)
 beta = complex(-0.3, 0.4)
 qstate = normalize_state(alpha, beta)
 
-print('------------------------------------------------------------------')
-print('Ex1. Normalizing a qubit state: ')
-print(qstate)
-print('------------------------------------------------------------------\n')
-
-print('------------------------------------------------------------------')
-print('Ex2. Inner product: ')
-ket_0 = np.array([1, 0])
-ket_1 = np.array([0, 1])
-print(f"<0|0> = {inner_product(ket_0, ket_0)}")
-print(f"<0|1> = {inner_product(ket_0, ket_1)}")
-print(f"<1|0> = {inner_product(ket_1, ket_0)}")
-print(f"<1|1> = {inner_product(ket_1, ket_1)}")
-print('------------------------------------------------------------------\n')
-
-print('------------------------------------------------------------------')
-print('Ex3. Measuring qubit states: ')
-state = np.array([0.8, 0.6])
+emit('------------------------------------------------------------------')
+emit('Ex1. Normalizing a qubit state: ')
+emit(qstate)
+emit('------------------------------------------------------------------\n')
+
+emit('------------------------------------------------------------------')
+emit('Ex2. Inner product: ')
+ket_0 = np.array([1, 0], dtype=np.complex64)
+ket_1 = np.array([0, 1], dtype=np.complex64)
+emit(f"<0|0> = {inner_product(ket_0, ket_0)}")
+emit(f"<0|1> = {inner_product(ket_0, ket_1)}")
+emit(f"<1|0> = {inner_product(ket_1, ket_0)}")
+emit(f"<1|1> = {inner_product(ket_1, ket_1)}")
+emit('------------------------------------------------------------------\n')
+
+emit('------------------------------------------------------------------')
+emit('Ex3. Measuring qubit states: ')
+state = np.array([0.8, 0.6], dtype=np.complex64)
 rand_outcomes = measure_state(state, 10)
-print(rand_outcomes)
-print('------------------------------------------------------------------\n')
+emit(rand_outcomes)
+emit('------------------------------------------------------------------\n')
 
-print('------------------------------------------------------------------')
-print('Ex4. Applying U gate: ')
-state = np.array([0.8, 0.6])
+emit('------------------------------------------------------------------')
+emit('Ex4. Applying U gate: ')
+state = np.array([0.8, 0.6], dtype=np.complex64)
 applyu_outcomes = apply_u(state)
-print(applyu_outcomes)
-print('------------------------------------------------------------------\n')
+emit(applyu_outcomes)
+emit('------------------------------------------------------------------\n')
 
-print('------------------------------------------------------------------')
-print('Ex5. Simulating a simple qubit: ')
+emit('------------------------------------------------------------------')
+emit('Ex5. Simulating a simple qubit: ')
 quantum_algorithm()
-print('------------------------------------------------------------------\n')
\ No newline at end of file
+if jax is not None:
+    emit("- Outcome of the jitted version: ", quantum_algorithm_jax(jax.random.PRNGKey(0)))
+emit('------------------------------------------------------------------\n')
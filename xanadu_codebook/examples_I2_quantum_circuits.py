@@ -1,5 +1,10 @@
 import pennylane as qml
 
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
 def my_quantum_function(params):
 
     # single qubit operations with no input parameters
@@ -29,10 +34,10 @@ def my_circuit1(theta, phi):
     return qml.probs(wires=[0, 1, 2])
 
 meas_outcome = my_circuit1(0.8, 0.6)
-print('-----------------------------------------------')
-print("Measurement outcome - my_circuit1: ")
-print(meas_outcome)
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("Measurement outcome - my_circuit1: ")
+emit(meas_outcome)
+emit('-----------------------------------------------\n')
 
 # need a device to run the quantum simulator
 # dev = qml.device('device.name', wires=num_qubits)
@@ -64,7 +69,7 @@ theta, phi, omega = 0.1, 0.2, 0.3
 # Now we can execute the QNode by calling it like we would a regular function
 resource_calculator = qml.specs(my_circuit2)
 outcome = my_circuit2(theta, phi, omega)
-print('-----------------------------------------------')
-print("Measurement outcome running on QNode for my_circuit2: ")
-print(outcome)
-print('-----------------------------------------------\n')
\ No newline at end of file
+emit('-----------------------------------------------')
+emit("Measurement outcome running on QNode for my_circuit2: ")
+emit(outcome)
+emit('-----------------------------------------------\n')
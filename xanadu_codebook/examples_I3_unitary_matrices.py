@@ -1,9 +1,15 @@
 import pennylane as qml
 import numpy as np
 
-dev = qml.device("default.qubit", wires=1)
+from codebook_output import emit, write_on_exit
 
-U = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+if __name__ == "__main__":
+    write_on_exit()
+
+dev = qml.device("lightning.qubit", wires=1)
+
+U = np.array([[1, 1], [1, -1]], dtype=np.complex128) / np.sqrt(2)
+U.flags.writeable = False
 
 @qml.qnode(dev)
 def apply_u():
@@ -14,11 +20,11 @@ def apply_u():
     # Return the state
     return qml.state()
 
-print('-----------------------------------------------')
-print("Aplly U gate with QubitUnitary: ")
+emit('-----------------------------------------------')
+emit("Aplly U gate with QubitUnitary: ")
 outcome = apply_u()
-print(outcome)
-print('-----------------------------------------------\n')
+emit(outcome)
+emit('-----------------------------------------------\n')
 
 @qml.qnode(dev)
 def apply_u_as_rot(phi, theta, omega):
@@ -27,9 +33,9 @@ def apply_u_as_rot(phi, theta, omega):
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("Aplly U gate with QubitUnitary by using rot: ")
+emit('-----------------------------------------------')
+emit("Aplly U gate with QubitUnitary by using rot: ")
 theta, phi, omega = 0.1, 0.2, 0.3
 outcome = apply_u_as_rot(theta, phi, omega)
-print(outcome)
-print('-----------------------------------------------\n')
\ No newline at end of file
+emit(outcome)
+emit('-----------------------------------------------\n')
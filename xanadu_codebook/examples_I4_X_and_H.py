@@ -1,19 +1,26 @@
 import pennylane as qml
 import numpy as np
 
-dev = qml.device("default.qubit", wires=1)
+from codebook_cache import cached_qnode
+from codebook_output import emit, write_on_exit
 
-U = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+if __name__ == "__main__":
+    write_on_exit()
+
+DEV1 = qml.device('lightning.qubit', wires=1)
+
+U = np.array([[1, 1], [1, -1]], dtype=np.complex128) / np.sqrt(2)
+U.flags.writeable = False
 
 # -----------------------------------------------------
 # Varying the initial state of a qubit by PauliX
 # -----------------------------------------------------
 
-@qml.qnode(dev)
+@cached_qnode
+@qml.qnode(DEV1)
 def varied_initial_state(state):
 
-    # initialzie a qubit in state 0
-    qml.QubitStateVector([1, 0], wires=0)
+    # the device already initializes the qubit in state 0
 
     # if state is 1, then flipping the initial qubit
     if state == 1:
@@ -24,36 +31,35 @@ def varied_initial_state(state):
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("Vary the initial state of a qubit and apply U gate with QubitUnitary: ")
+emit('-----------------------------------------------')
+emit("Vary the initial state of a qubit and apply U gate with QubitUnitary: ")
 state = 1
 outcome = varied_initial_state(state)
-print(outcome)
-print('-----------------------------------------------\n')
+emit(outcome)
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Applying Hadamard gate
 # -----------------------------------------------------
-dev = qml.device("default.qubit", wires=1)
-
-@qml.qnode(dev)
+@qml.qnode(DEV1)
 def apply_hadamard():
 
     qml.Hadamard(0)
     
     return qml.state()
 
-print('-----------------------------------------------')
-print("Applying hamadard gate: ")
+emit('-----------------------------------------------')
+emit("Applying hamadard gate: ")
 outcome = apply_hadamard()
-print(outcome)
-print('-----------------------------------------------\n')
+emit(outcome)
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Applying Hadamard gate
 # -----------------------------------------------------
 
-@qml.qnode(dev)
+@cached_qnode
+@qml.qnode(DEV1)
 def apply_hadamard_to_state(state):
     """Complete the function such that we can apply the Hadamard to
     either |0> or |1> depending on the input argument flag.
@@ -67,8 +73,6 @@ def apply_hadamard_to_state(state):
     """
 
     # KEEP THE QUBIT IN |0> OR CHANGE IT TO |1> DEPENDING ON state
-    qml.QubitStateVector([1, 0], wires=0)
-
     # if state is 1, then flipping the initial qubit
     if state == 1:
         qml.PauliX(wires=0)
@@ -79,23 +83,22 @@ def apply_hadamard_to_state(state):
     # RETURN THE STATE
     return qml.state()
 
-print('-----------------------------------------------')
-print("Applying hamadard to the state: ")
-print("  + State 0:")
-print(apply_hadamard_to_state(0))
-print("  + State 1:")
-print(apply_hadamard_to_state(1))
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("Applying hamadard to the state: ")
+emit("  + State 0:")
+emit(apply_hadamard_to_state(0))
+emit("  + State 1:")
+emit(apply_hadamard_to_state(1))
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Creating a simple circuit
 # -----------------------------------------------------
 
-dev = qml.device("default.qubit", wires=1)
-@qml.qnode(dev)
+@cached_qnode
+@qml.qnode(DEV1)
 def apply_hxh(state):
     
-    qml.QubitStateVector([1, 0], wires=0)
     if state == 1:
         qml.PauliX(0)
     
@@ -105,11 +108,10 @@ def apply_hxh(state):
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("Applying the HXH circuit: ")
-print("  + State 0:")
-print(apply_hxh(0))
-print("  + State 1:")
-print(apply_hxh(1))
-print('-----------------------------------------------\n')
-
+emit('-----------------------------------------------')
+emit("Applying the HXH circuit: ")
+emit("  + State 0:")
+emit(apply_hxh(0))
+emit("  + State 1:")
+emit(apply_hxh(1))
+emit('-----------------------------------------------\n')
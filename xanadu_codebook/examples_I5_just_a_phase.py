@@ -1,13 +1,66 @@
 import pennylane as qml
 import numpy as np
 
-dev = qml.device("default.qubit", wires=1)
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
+DEV1 = qml.device('lightning.qubit', wires=1)
+DEV3 = qml.device('lightning.qubit', wires=3)
+
+# -----------------------------------------------------
+# Fuse consecutive single-qubit gates before simulation
+# -----------------------------------------------------
+
+@qml.transform
+def fuse_single_qubit(tape):
+    """Fuse each run of consecutive gates acting on the same single wire
+    into one QubitUnitary, so that the device applies one 2x2 matrix per run.
+
+    Args:
+        tape (QuantumTape): The circuit to transform.
+
+    Returns:
+        list[QuantumTape], function: The fused circuit and the function that
+        post-processes its execution result.
+    """
+
+    operations = []
+    run = []
+
+    def flush():
+        # a single gate is kept as it is: only runs of two or more are fused
+        if len(run) < 2:
+            operations.extend(run)
+        else:
+            # the last gate of the run is the leftmost factor of the product
+            matrix = np.linalg.multi_dot([qml.matrix(op) for op in reversed(run)])
+            operations.append(qml.QubitUnitary(matrix, wires=run[0].wires))
+        run.clear()
+
+    for op in tape.operations:
+        if len(op.wires) != 1:
+            flush()
+            operations.append(op)
+            continue
+        if run and op.wires != run[-1].wires:
+            flush()
+        run.append(op)
+    flush()
+
+    fused_tape = qml.tape.QuantumScript(operations, tape.measurements, shots=tape.shots)
+
+    def null_postprocessing(results):
+        return results[0]
+
+    return [fused_tape], null_postprocessing
 
 # -----------------------------------------------------
 # Varying the initial state of a qubit by PauliX
 # -----------------------------------------------------
 
-@qml.qnode(dev)
+@qml.qnode(DEV1)
 def apply_z_to_plus():
     """Write a circuit that applies PauliZ to the |+> state and returns
     the state.
@@ -27,16 +80,16 @@ def apply_z_to_plus():
     # return the state
     return qml.state()
 
-print('-----------------------------------------------')
-print("Applying the HXH circuit: ")
-print(apply_z_to_plus())
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("Applying the HXH circuit: ")
+emit(apply_z_to_plus())
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # 
 # -----------------------------------------------------
 
-@qml.qnode(dev)
+@qml.qnode(DEV1)
 def fake_z():
     """Use RZ to produce the same action as Pauli Z on the |+> state.
 
@@ -53,16 +106,17 @@ def fake_z():
     # return the state
     return qml.state()
 
-print('-----------------------------------------------')
-print("Applying the RZ gate: ")
-print(fake_z())
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("Applying the RZ gate: ")
+emit(fake_z())
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # 
 # -----------------------------------------------------
 
-@qml.qnode(dev)
+@fuse_single_qubit
+@qml.qnode(DEV1)
 def many_rotations():
     """Implement the circuit depicted above and return the quantum state.
 
@@ -73,25 +127,24 @@ def many_rotations():
     # IMPLEMENT THE CIRCUIT
     qml.Hadamard(wires=0)
     qml.S(wires=0)
-    qml.adjoint(qml.T(wires=0))
+    qml.PhaseShift(-np.pi/4, wires=0)
     qml.RZ(0.3, wires=0)
-    qml.adjoint(qml.S(wires=0))
+    qml.PhaseShift(-np.pi/2, wires=0)
 
     # RETURN THE STATE
     return qml.state()
 
-print('-----------------------------------------------')
-print("Applying many rotation: ")
-print(many_rotations())
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("Applying many rotation: ")
+emit(many_rotations())
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # 
 # -----------------------------------------------------
 
-dev = qml.device('default.qubit', wires=3)
-
-@qml.qnode(dev)
+@fuse_single_qubit
+@qml.qnode(DEV3)
 def too_many_ts():
     """You can implement the original circuit here as well, it may help you with
     testing to ensure that the circuits have the same effect.
@@ -104,8 +157,8 @@ def too_many_ts():
     qml.T(wires=0)
     qml.T(wires=0)
     qml.Hadamard(wires=0)
-    qml.adjoint(qml.T(wires=0))
-    qml.adjoint(qml.T(wires=0))
+    qml.PhaseShift(-np.pi/4, wires=0)
+    qml.PhaseShift(-np.pi/4, wires=0)
     qml.Hadamard(wires=0)
 
     # for wire = 1
@@ -120,16 +173,17 @@ def too_many_ts():
 
     # for wire = 2
     qml.Hadamard(wires=2)
-    qml.adjoint(qml.T(wires=2))
+    qml.PhaseShift(-np.pi/4, wires=2)
     qml.Hadamard(wires=2)
-    qml.adjoint(qml.T(wires=2))
-    qml.adjoint(qml.T(wires=2))
-    qml.adjoint(qml.T(wires=2))
+    qml.PhaseShift(-np.pi/4, wires=2)
+    qml.PhaseShift(-np.pi/4, wires=2)
+    qml.PhaseShift(-np.pi/4, wires=2)
     qml.Hadamard(wires=2)
 
     return qml.probs(wires=[0, 1, 2])
 
-@qml.qnode(dev)
+@fuse_single_qubit
+@qml.qnode(DEV3)
 def just_enough_ts():
     """Implement an equivalent circuit as the above with the minimum number of 
     T and T^\dagger gates required.
@@ -142,7 +196,7 @@ def just_enough_ts():
     qml.Hadamard(wires=0)
     qml.S(wires=0)
     qml.Hadamard(wires=0)
-    qml.adjoint(qml.S(wires=0))
+    qml.PhaseShift(-np.pi/2, wires=0)
     qml.Hadamard(wires=0)
 
     # Wire 1
@@ -157,38 +211,40 @@ def just_enough_ts():
 
     # Wire 2
     qml.Hadamard(wires=2)
-    qml.adjoint(qml.T(wires=2))
+    qml.PhaseShift(-np.pi/4, wires=2)
     qml.Hadamard(wires=2)
-    qml.adjoint(qml.S(wires=2))
-    qml.adjoint(qml.T(wires=2))
+    qml.PhaseShift(-np.pi/2, wires=2)
+    qml.PhaseShift(-np.pi/4, wires=2)
     qml.Hadamard(wires=2)
 
     return qml.probs(wires=[0, 1, 2])
 
-print('-----------------------------------------------')
-print("Applying too_many_ts(): ")
-print(too_many_ts())
-print('-----------------------------------------------')
-print("Applying just_enough_ts(): ")
-print(just_enough_ts())
-print('-----------------------------------------------')
+# the fused matrices leave round-off of ~1e-33 where the gate-by-gate circuit
+# gives exact zeros, so the probabilities are rounded for display
+emit('-----------------------------------------------')
+emit("Applying too_many_ts(): ")
+emit(np.round(too_many_ts(), 12))
+emit('-----------------------------------------------')
+emit("Applying just_enough_ts(): ")
+emit(np.round(just_enough_ts(), 12))
+emit('-----------------------------------------------')
 
 # FILL IN THE CORRECT VALUES FOR THE ORIGINAL CIRCUIT
 original_depth = 8
 original_t_count = 13
 original_t_depth = 6
-print('-----------------------------------------------')
-print("  + original_depth: ", original_depth)
-print("  + original_t_count: ", original_t_count)
-print("  + original_t_depth: ", original_depth)
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("  + original_depth: ", original_depth)
+emit("  + original_t_count: ", original_t_count)
+emit("  + original_t_depth: ", original_depth)
+emit('-----------------------------------------------\n')
 
 # FILL IN THE CORRECT VALUES FOR THE NEW, OPTIMIZED CIRCUIT
 optimal_depth = 6
 optimal_t_count = 3
 optimal_t_depth = 2
-print('-----------------------------------------------')
-print("  + optimal_depth: ", optimal_depth)
-print("  + optimal_t_count: ", optimal_t_count)
-print("  + optimal_t_depth: ", optimal_t_depth)
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("  + optimal_depth: ", optimal_depth)
+emit("  + optimal_t_count: ", optimal_t_count)
+emit("  + optimal_t_depth: ", optimal_t_depth)
+emit('-----------------------------------------------\n')
@@ -1,12 +1,22 @@
 import pennylane as qml
 import numpy as np
 
-dev = qml.device("default.qubit", wires=1)
+from functools import partial
+
+from codebook_cache import cached_qnode
+from codebook_jax import jit, jnp, INTERFACE
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
+dev = qml.device("lightning.qubit", wires=1)
 
 # -----------------------------------------------------
 # Applying RX gate
 # -----------------------------------------------------
 
+@cached_qnode
 @qml.qnode(dev)
 def apply_rx_pi(state):
     """Apply an RX gate with an angle of \pi to a particular basis state.
@@ -25,24 +35,26 @@ def apply_rx_pi(state):
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("Applying apply_rx_pi(0): ")
-print(apply_rx_pi(0))
-print('-----------------------------------------------')
-print("Applying apply_rx_pi(1): ")
-print(apply_rx_pi(1))
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("Applying apply_rx_pi(0): ")
+emit(apply_rx_pi(0))
+emit('-----------------------------------------------')
+emit("Applying apply_rx_pi(1): ")
+emit(apply_rx_pi(1))
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Applying RX to modify the amplitudes of a quantum state
 # -----------------------------------------------------
 
-@qml.qnode(dev)
+# state selects the circuit structure, so it is a static argument of the jitted QNode
+@partial(jit, static_argnums=1)
+@qml.qnode(dev, interface=INTERFACE)
 def apply_rx2mod_amplitute(theta, state):
     """Apply an RX gate with an angle of theta to a particular basis state.
     
     Args:
-        theta (float): A rotation angle.
+        theta (float or array[float]): A rotation angle, or a batch of angles.
         state (int): Either 0 or 1. If 1, initialize the qubit to state |1>
             before applying other operations.
     
@@ -56,28 +68,31 @@ def apply_rx2mod_amplitute(theta, state):
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("Applying apply_rx2mod_amplitute(): ")
+emit('-----------------------------------------------')
+emit("Applying apply_rx2mod_amplitute(): ")
 
-angles = np.linspace(0, 4*np.pi, 200)
-print("  + angles:")
-print(angles)
+angles = jnp.linspace(0, 4*jnp.pi, 200)
+emit("  + angles:")
+emit(angles)
 
-output_states = np.array([apply_rx2mod_amplitute(t, 0) for t in angles])
-print("  + the output states:")
-print(output_states)
-print('-----------------------------------------------\n')
+# theta is broadcast over all the angles, giving states of shape (200, 2)
+output_states = apply_rx2mod_amplitute(angles, 0)
+emit("  + the output states:")
+emit(output_states)
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Applying RY to modify the amplitudes of a quantum state
 # -----------------------------------------------------
 
-@qml.qnode(dev)
+# state selects the circuit structure, so it is a static argument of the jitted QNode
+@partial(jit, static_argnums=1)
+@qml.qnode(dev, interface=INTERFACE)
 def apply_ry2mod_amplitute(theta, state):
     """Apply an RY gate with an angle of theta to a particular basis state.
     
     Args:
-        theta (float): A rotation angle.
+        theta (float or array[float]): A rotation angle, or a batch of angles.
         state (int): Either 0 or 1. If 1, initialize the qubit to state |1>
             before applying other operations.
     
@@ -91,14 +106,14 @@ def apply_ry2mod_amplitute(theta, state):
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("Applying apply_ry2mod_amplitute(): ")
-angles = np.linspace(0, 4*np.pi, 200)
-print("  + angles:")
-print(angles)
-
-output_states = np.array([apply_ry2mod_amplitute(t, 0) for t in angles])
-print("  + the output states:")
-print(output_states)
-print('-----------------------------------------------\n')
-
+emit('-----------------------------------------------')
+emit("Applying apply_ry2mod_amplitute(): ")
+angles = jnp.linspace(0, 4*jnp.pi, 200)
+emit("  + angles:")
+emit(angles)
+
+# theta is broadcast over all the angles, giving states of shape (200, 2)
+output_states = apply_ry2mod_amplitute(angles, 0)
+emit("  + the output states:")
+emit(output_states)
+emit('-----------------------------------------------\n')
@@ -1,7 +1,12 @@
 import pennylane as qml
 import numpy as np
 
-dev = qml.device("default.qubit", wires=1)
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
+dev = qml.device("lightning.qubit", wires=1)
 
 # -----------------------------------------------------
 # Adjusting the angels to transform RZ-RX-RZ to H
@@ -22,11 +27,11 @@ def apply_hadamard():
     qml.Hadamard(0)
     return qml.state()
 
-print('-----------------------------------------------')
-print("Checking hadamard_with_rz_rx(): ")
-print(hadamard_with_rz_rx())
-print(apply_hadamard())
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("Checking hadamard_with_rz_rx(): ")
+emit(hadamard_with_rz_rx())
+emit(apply_hadamard())
+emit('-----------------------------------------------\n')
 
 # -----------------------------------------------------
 # Converting H-S-conj(T)-Y by using only RZ, RX
@@ -37,7 +42,7 @@ phi, theta, omega = np.pi/2, np.pi/2, np.pi/2
 def origin_circuit():
     qml.Hadamard(0)
     qml.S(0)
-    qml.adjoint(qml.T(wires=0))
+    qml.PhaseShift(-np.pi/4, wires=0)
     qml.PauliY(0)
     
     return qml.state()
@@ -47,19 +52,16 @@ def convert_to_rz_rx():
     
     qml.RZ(phi, wires=0)
     qml.RX(theta, wires=0)
-    qml.RZ(omega, wires=0)
-    
-    qml.RZ(np.pi/2, wires=0)
-    qml.RZ(-np.pi/4, wires = 0)
     
-    qml.RZ(np.pi,wires=0)
+    # RZ(omega), S, conj(T) and the RZ part of Y, merged into one rotation
+    qml.RZ(omega + np.pi/2 - np.pi/4 + np.pi, wires=0)
     qml.RX(np.pi, wires=0)
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("Converting H-S-conj(T)-Y by convert_to_rz_rx():")
-print(convert_to_rz_rx())
-print("Checking with the original circuit:")
-print(origin_circuit())
-print('-----------------------------------------------\n')
\ No newline at end of file
+emit('-----------------------------------------------')
+emit("Converting H-S-conj(T)-Y by convert_to_rz_rx():")
+emit(convert_to_rz_rx())
+emit("Checking with the original circuit:")
+emit(origin_circuit())
+emit('-----------------------------------------------\n')
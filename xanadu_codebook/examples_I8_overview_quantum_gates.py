@@ -1,29 +1,30 @@
 import pennylane as qml
 import numpy as np
 
-dev = qml.device("default.qubit", wires=1)
+from functools import lru_cache
+
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
+dev = qml.device("lightning.qubit", wires=1)
 
 # -----------------------------------------------------
 # Prepare a state: 1/sqrt(2) |0> + 1/sqrt(2) e^{5/2 i pi} |1>
 # -----------------------------------------------------
 
+# H followed by five T gates, fused into one unitary: T^5 = diag(1, e^{5i pi/4})
+H = np.array([[1, 1], [1, -1]], dtype=np.complex128) / np.sqrt(2)
+U1 = np.diag([1, np.exp(5j * np.pi / 4)]) @ H
+
 @qml.qnode(dev)
 def prepare_state_1():
 
-    qml.Hadamard(wires=0)
-    qml.T(wires=0)
-    qml.T(wires=0)
-    qml.T(wires=0)
-    qml.T(wires=0)
-    qml.T(wires=0)
+    qml.QubitUnitary(U1, wires=0)
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("Checking prepare_state_1(): ")
-print(prepare_state_1())
-print('-----------------------------------------------\n')
-
 # -----------------------------------------------------
 # Prepare a state: sqrt(3)/2 |0> - i/2 |1>
 # -----------------------------------------------------
@@ -35,27 +36,61 @@ def prepare_state_2():
 
     return qml.state()
 
-print('-----------------------------------------------')
-print("Checking prepare_state_2(): ")
-print(prepare_state_2())
-print('-----------------------------------------------\n')
-
 # -----------------------------------------------------
 # Prepare a state: 
 # (0.52889389 - 0.14956775i) |0> + (0.6726317 + 0.49545818i) |1>
-# using qml.MottonenStatePreparation
+# using the RZ RY RZ rotations that qml.MottonenStatePreparation reduces to
 # -----------------------------------------------------
-v = np.array([0.52889389-0.14956775j, 0.67262317+0.49545818j])
+v = np.array([0.52889389-0.14956775j, 0.67262317+0.49545818j], dtype=np.complex128)
+
+# for a single qubit Mottonen reduces to RZ(lam) RY(theta) RZ(phi) acting on |0>,
+# so the angles are computed directly from the state instead of expanding the template
+def state_angles(state):
+    """Return the (theta, phi, lam) angles with RZ(phi) RY(theta) RZ(lam)|0> = state."""
+    theta = 2 * np.arccos(np.abs(state[0]))
+    phi = np.angle(state[1]) - np.angle(state[0])
+    lam = -np.angle(state[0]) - np.angle(state[1])
+    return theta, phi, lam
+
 @qml.qnode(dev)
 def prepare_state_3(state=v):
     
-    qml.MottonenStatePreparation(v,wires=0)
+    theta, phi, lam = state_angles(state)
+    qml.RZ(lam, wires=0)
+    qml.RY(theta, wires=0)
+    qml.RZ(phi, wires=0)
     return qml.state()
 
+@lru_cache(maxsize=32)
+def draw_prepare_state_3(state_key):
+    """Draw prepare_state_3 once per input state; later calls reuse the string."""
+    return qml.draw(prepare_state_3, expansion_strategy='device')(np.array(state_key))
+
+# -----------------------------------------------------
+# Run the three state preparations as one batch: their tapes are
+# recorded once and sent to the device in a single qml.execute call
+# -----------------------------------------------------
+tapes = [
+    qml.tape.make_qscript(prepare_state_1.func)(),
+    qml.tape.make_qscript(prepare_state_2.func)(),
+    qml.tape.make_qscript(prepare_state_3.func)(v),
+]
+state_1, state_2, state_3 = qml.execute(tapes, dev, gradient_fn=None)
+
+emit('-----------------------------------------------')
+emit("Checking prepare_state_1(): ")
+emit(state_1)
+emit('-----------------------------------------------\n')
+
+emit('-----------------------------------------------')
+emit("Checking prepare_state_2(): ")
+emit(state_2)
+emit('-----------------------------------------------\n')
+
 # This will draw the quantum circuit and allow you to inspect the output gates
-print('-----------------------------------------------')
-print("Checking prepare_state_3(): ")
-print(prepare_state_3(v))
-print()
-print(qml.draw(prepare_state_3, expansion_strategy='device')(v))
-print('-----------------------------------------------\n')
\ No newline at end of file
+emit('-----------------------------------------------')
+emit("Checking prepare_state_3(): ")
+emit(state_3)
+emit()
+emit(draw_prepare_state_3(tuple(v.tolist())))
+emit('-----------------------------------------------\n')
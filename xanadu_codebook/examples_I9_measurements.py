@@ -1,13 +1,20 @@
 import pennylane as qml
 import numpy as np
 
-dev = qml.device("default.qubit", wires=1)
+from codebook_cache import cached_qnode
+from codebook_output import emit, write_on_exit
+
+if __name__ == "__main__":
+    write_on_exit()
+
+DEV1 = qml.device('lightning.qubit', wires=1)
 
 # -----------------------------------------------------
 # Measurement with Hadamard gate
 # -----------------------------------------------------
 
-@qml.qnode(dev)
+@cached_qnode
+@qml.qnode(DEV1)
 def apply_h_and_measure(state):
     """Complete the function such that we apply the Hadamard gate
     and measure in the computational basis.
@@ -26,16 +33,16 @@ def apply_h_and_measure(state):
 
     return qml.probs(wires=0)
 
-print('-----------------------------------------------')
-print("Checking the measurement of |0>: ")
-print(apply_h_and_measure(0))
-print("Checking the measurement of |1>: ")
-print(apply_h_and_measure(1))
-print('-----------------------------------------------\n')
+emit('-----------------------------------------------')
+emit("Checking the measurement of |0>: ")
+emit(apply_h_and_measure(0))
+emit("Checking the measurement of |1>: ")
+emit(apply_h_and_measure(1))
+emit('-----------------------------------------------\n')
 
 
 # prepare a state (1/2)|0> + i(sqrt(3)/2)|1>
-# psi = np.array([0.5+0j, 0 + np.sqrt(3)/2j])
+# psi = np.array([0.5, np.sqrt(3)/2j], dtype=np.complex128)
 def prepare_psi():
     # qml.MottonenStatePreparation(psi,wires=0)
     qml.RX(np.pi/3, wires=0)
@@ -46,20 +53,21 @@ def y_basis_rotation():
     qml.Hadamard(wires=0)
     qml.S(wires=0)
 
-dev = qml.device("default.qubit", wires=1)
-@qml.qnode(dev)
+@qml.qnode(DEV1)
 def measure_in_y_basis():
     
     # PREPARE THE STATE
     prepare_psi()
 
     # PERFORM THE ROTATION BACK TO COMPUTATIONAL BASIS
-    qml.adjoint(y_basis_rotation)
+    # (the inverse of y_basis_rotation: S^dagger, then H)
+    qml.PhaseShift(-np.pi/2, wires=0)
+    qml.Hadamard(wires=0)
 
     # RETURN THE MEASUREMENT OUTCOME PROBABILITIES
     return qml.probs(wires=0)
 
-print('-----------------------------------------------')
-print("Checking measure_in_y_basis: ")
-print(measure_in_y_basis())
-print('-----------------------------------------------\n')
\ No newline at end of file
+emit('-----------------------------------------------')
+emit("Checking measure_in_y_basis: ")
+emit(measure_in_y_basis())
+emit('-----------------------------------------------\n')